@@ -0,0 +1,220 @@
+"""Load test: N concurrent clients uploading, reconciling and exporting.
+
+Run from backend/recon-backend:
+
+    python benchmarks/load.py --clients 16 --iterations 5 --rows 2000
+    python benchmarks/load.py --url http://127.0.0.1:5000   # against a running server
+
+Without --url the Flask app is served in-process on a threaded WSGI server.
+Every client uploads data with its own reference prefix and a known overlap,
+and each response and export is checked against the expected counts. A result
+belonging to another client shows up as a verification failure.
+"""
+import argparse
+import csv
+import http.client
+import io
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STATUSES = ['Completed', 'Pending', 'Failed']
+
+
+def make_upload(client, iteration, rows):
+    """Return (internal_csv, provider_csv, expected) with `offset` unmatched rows on each side"""
+    prefix = f'C{client:03d}I{iteration:03d}-'
+    offset = 1 + (client + iteration) % 7
+    internal = ['transaction_id,amount,status']
+    provider = ['ref_id,total,state']
+    for i in range(rows):
+        internal.append(f'{prefix}{i:07d},{100 + i % 500}.00,{STATUSES[i % 3]}')
+        provider.append(f'{prefix}{i + offset:07d},{100 + (i + offset) % 500}.00,{STATUSES[(i + offset) % 3]}')
+    expected = {
+        'prefix': prefix,
+        'matched': rows - offset,
+        'internal_only': offset,
+        'provider_only': offset
+    }
+    return '\n'.join(internal).encode(), '\n'.join(provider).encode(), expected
+
+
+def encode_multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: text/csv\r\n\r\n'.encode()
+        )
+        body.write(content)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+class Recorder:
+    """Thread-safe latency and outcome log per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.failures = []
+
+    def record(self, endpoint, elapsed, ok):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def fail(self, message):
+        with self.lock:
+            self.failures.append(message)
+
+
+def timed_request(recorder, endpoint, request):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            body = response.read()
+        recorder.record(endpoint, time.perf_counter() - started, True)
+        return body
+    except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+        recorder.record(endpoint, time.perf_counter() - started, False)
+        recorder.fail(f'{endpoint}: {e}')
+        return None
+
+
+def run_client(base_url, client, iterations, rows, recorder):
+    for iteration in range(iterations):
+        # A malformed response fails this round only, so the run still reaches its report
+        try:
+            run_iteration(base_url, client, iteration, rows, recorder)
+        except Exception as e:
+            recorder.fail(f'client {client}/{iteration}: {type(e).__name__}: {e}')
+
+
+def run_iteration(base_url, client, iteration, rows, recorder):
+    internal, provider, expected = make_upload(client, iteration, rows)
+    body, content_type = encode_multipart(
+        {'job_id': f'load-{client}-{iteration}-{uuid.uuid4().hex[:8]}'},
+        {'internal_file': ('internal.csv', internal), 'provider_file': ('provider.csv', provider)}
+    )
+    request = urllib.request.Request(
+        f'{base_url}/api/upload_and_reconcile',
+        data=body,
+        headers={'Content-Type': content_type},
+        method='POST'
+    )
+    response = timed_request(recorder, 'upload_and_reconcile', request)
+    if response is None:
+        return
+
+    result = json.loads(response)
+    summary = result.get('summary', {})
+    for key in ('matched', 'internal_only', 'provider_only'):
+        if summary.get(key) != expected[key]:
+            recorder.fail(f"client {client}/{iteration}: {key} {summary.get(key)} != {expected[key]}")
+    if any(not row['transaction_reference'].startswith(expected['prefix']) for row in result.get('matched', [])):
+        recorder.fail(f'client {client}/{iteration}: matched rows from another upload')
+
+    query = urllib.parse.urlencode({'category': 'matched', 'session_id': result.get('session_id', '')})
+    exported = timed_request(recorder, 'export_csv', f'{base_url}/api/export_csv?{query}')
+    if exported is not None:
+        exported_rows = list(csv.DictReader(io.StringIO(exported.decode())))
+        if len(exported_rows) != expected['matched']:
+            recorder.fail(f"client {client}/{iteration}: exported {len(exported_rows)} != {expected['matched']}")
+
+    query = urllib.parse.urlencode({'session_id': result.get('session_id', '')})
+    archive = timed_request(recorder, 'export_all', f'{base_url}/api/export_all?{query}')
+    if archive is not None:
+        with zipfile.ZipFile(io.BytesIO(archive)) as zipf:
+            if len(zipf.namelist()) != 3:
+                recorder.fail(f'client {client}/{iteration}: archive has {zipf.namelist()}')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def serve_in_process():
+    from werkzeug.serving import make_server
+    from src.main import app
+
+    # Per-request access logs would drown the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--iterations', type=int, default=5, help='upload/export rounds per client')
+    parser.add_argument('--rows', type=int, default=1000, help='rows per uploaded file')
+    parser.add_argument('--url', help='base URL of a running server instead of an in-process one')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip('/') if args.url else None
+    if base_url is None:
+        server, base_url = serve_in_process()
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            futures = [
+                pool.submit(run_client, base_url, client, args.iterations, args.rows, recorder)
+                for client in range(args.clients)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        if server is not None:
+            server.shutdown()
+    wall = time.perf_counter() - started
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    errors = sum(recorder.errors.values())
+    print(f'{args.clients} clients x {args.iterations} iterations, {args.rows} rows per file, {wall:.1f}s')
+    print(f'{"endpoint":<22}{"count":>7}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for endpoint, values in recorder.latencies.items():
+        print(
+            f'{endpoint:<22}{len(values):>7}'
+            f'{percentile(values, 50) * 1000:>10.1f}'
+            f'{percentile(values, 95) * 1000:>10.1f}'
+            f'{percentile(values, 99) * 1000:>10.1f}'
+            f'{recorder.errors.get(endpoint, 0):>8}'
+        )
+    print(f'throughput {total / wall:.1f} req/s, error rate {errors / max(total, 1):.2%}')
+    if total:
+        print(f'mean latency {statistics.mean(v for values in recorder.latencies.values() for v in values) * 1000:.1f} ms')
+    print(f'verification failures {len(recorder.failures)}')
+    for failure in recorder.failures[:10]:
+        print(f'  {failure}')
+
+    return 1 if errors or recorder.failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
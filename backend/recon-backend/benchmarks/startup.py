@@ -0,0 +1,140 @@
+"""Startup benchmark: cold import time and per-worker memory.
+
+Run from backend/recon-backend:
+
+    python benchmarks/startup.py                 # import timings only
+    python benchmarks/startup.py --workers 4     # plus gunicorn worker RSS/PSS
+
+Worker memory is read from /proc/<pid>/smaps_rollup, so that part is Linux only.
+Both gunicorn runs keep scikit-learn unloaded (RECON_PRELOAD_ML=0), since
+no-preload workers only import it on their first anomaly scoring run.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import time
+started = time.perf_counter()
+from src.wsgi import app
+if {load_ml}:
+    from src.routes.reconciliation import load_anomaly_models
+    load_anomaly_models()
+elapsed = time.perf_counter() - started
+with open('/proc/self/status') as status:
+    rss_kb = next(int(line.split()[1]) for line in status if line.startswith('VmRSS:'))
+print(elapsed, rss_kb)
+"""
+
+
+def measure_import(load_ml, repeats):
+    timings = []
+    rss = []
+    for _ in range(repeats):
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_PROBE.format(load_ml=load_ml)],
+            cwd=BACKEND_DIR,
+            stderr=subprocess.DEVNULL
+        )
+        elapsed, rss_kb = output.split()
+        timings.append(float(elapsed))
+        rss.append(int(rss_kb))
+    return statistics.median(timings), statistics.median(rss) / 1024
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def read_smaps(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def measure_gunicorn(workers, preload, settle):
+    port = free_port()
+    env = dict(
+        os.environ,
+        BIND=f'127.0.0.1:{port}',
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_PRELOAD='1' if preload else '0',
+        # Compare like for like: without preload nothing imports scikit-learn
+        RECON_PRELOAD_ML='0'
+    )
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'src.wsgi:app'],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        ready = None
+        while ready is None:
+            if server.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1).close()
+                ready = time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        # Give the remaining workers time to finish booting
+        time.sleep(settle)
+        pids = worker_pids(server.pid)
+        return ready, [read_smaps(pid) for pid in pids]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5, help='cold imports per mode (median reported)')
+    parser.add_argument('--workers', type=int, default=0, help='also boot gunicorn with this many workers')
+    parser.add_argument('--settle', type=float, default=3.0, help='seconds to wait for workers after first response')
+    args = parser.parse_args()
+
+    print('Cold import (median of %d)' % args.repeats)
+    for label, load_ml in (('lazy ML', False), ('eager ML', True)):
+        elapsed, rss = measure_import(load_ml, args.repeats)
+        print(f'  {label:<10} {elapsed * 1000:8.1f} ms  {rss:8.1f} MiB RSS')
+
+    if args.workers:
+        print(f'\ngunicorn, {args.workers} workers, scikit-learn not loaded')
+        for label, preload in (('preload', True), ('no preload', False)):
+            ready, stats = measure_gunicorn(args.workers, preload, args.settle)
+            rss = sum(s['rss'] for s in stats) / len(stats)
+            pss = sum(s['pss'] for s in stats) / len(stats)
+            shared = sum(s['shared'] for s in stats) / len(stats)
+            print(
+                f'  {label:<10} ready {ready * 1000:8.1f} ms  per worker: '
+                f'{rss:7.1f} MiB RSS  {pss:7.1f} MiB PSS  {shared:7.1f} MiB shared'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import gc
+import os
+
+# Production settings for: gunicorn -c gunicorn.conf.py src.wsgi:app
+# Every value can be overridden through the environment.
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+# Stored results and progress jobs live in worker memory, and session_id/job_id
+# travel in query strings and paths, so no load balancer can pin them to a
+# worker. Keep one worker and scale with threads until that state is shared.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Every user with progress enabled holds two threads for the whole reconcile:
+# the upload and its /api/progress stream. Stream threads sit idle waiting for
+# events, so they are cheap; 32 threads serve about 16 concurrent uploads.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+# Reconciling a large file can take minutes
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 300))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycling a worker bounds memory growth from pandas/numpy but discards its
+# stored results and progress jobs, so it is off unless asked for
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = 50
+
+# Import the app in the master and fork afterwards so workers share its pages copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+# With preloading, also load scikit-learn in the master instead of on each worker's first request
+preload_ml = os.environ.get('RECON_PRELOAD_ML', '1') == '1'
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    if preload_ml:
+        from src.routes.reconciliation import load_anomaly_models
+        load_anomaly_models()
+    # Move everything imported so far out of the collector's reach; otherwise
+    # the first collection in each worker touches every object and un-shares its page
+    gc.freeze()
+    server.log.info('Preloaded application (ml=%s), %d objects frozen', preload_ml, gc.get_freeze_count())
@@ -8,6 +8,7 @@ from flask_cors import CORS
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.reconciliation import reconciliation_bp
+from src.routes.progress import progress_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -17,6 +18,7 @@ CORS(app)
 
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(reconciliation_bp, url_prefix='/api')
+app.register_blueprint(progress_bp, url_prefix='/api')
 
 # uncomment if you need to use database
 # Using an in-memory SQLite database for temporary data (data will be lost on restart)
@@ -0,0 +1,26 @@
+import pandas as pd
+
+
+def parse_dates(values):
+    """Parse a Series to UTC timestamps, unparseable values becoming NaT
+
+    ISO 8601 is tried first for speed. Leftover values are then inferred one
+    by one: a single inferred format would turn every row written differently
+    into NaT.
+    """
+    parsed = pd.to_datetime(values, errors='coerce', utc=True, format='ISO8601')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors='coerce', utc=True, format='mixed')
+    return parsed
+
+
+def to_utc_timestamp(value):
+    """Parse a single timestamp-like value to a naive UTC Timestamp
+
+    Naive values are taken as UTC. Raises ValueError if `value` cannot be parsed.
+    """
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from flask import Blueprint, Response, stream_with_context
+
+progress_bp = Blueprint('progress', __name__)
+
+# Pipeline stages, in the order they are published
+STAGES = [
+    'upload_received',
+    'rows_parsed',
+    'mapping_done',
+    'merge_done',
+    'anomalies_scored',
+    'stored'
+]
+# Not 'error': EventSource fires its own 'error' event on connection loss
+TERMINAL_STAGES = {'complete', 'failed'}
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+# Seconds a subscriber waits for its upload request to arrive; EventSource
+# clients reconnect on their own if the stream closes before that
+JOB_WAIT_TIMEOUT = 10
+# Seconds a finished job stays around so late subscribers can replay it
+JOB_RETENTION = 300
+
+
+class ProgressJob:
+    """Event log for a single reconciliation run"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.started = time.perf_counter()
+        self.finished_at = None
+        self.events = []
+        self.condition = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def publish(self, stage, error=None, **rows):
+        """Append a stage transition carrying row counts and elapsed time"""
+        event = {
+            'job_id': self.job_id,
+            'stage': stage,
+            'rows': rows,
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 2)
+        }
+        if error is not None:
+            event['error'] = error
+        with self.condition:
+            if self.finished:
+                return event
+            self.events.append(event)
+            if stage in TERMINAL_STAGES:
+                self.finished_at = time.monotonic()
+            self.condition.notify_all()
+        return event
+
+    def wait_for(self, cursor, timeout):
+        """Return events after `cursor`, blocking up to `timeout` seconds for new ones"""
+        with self.condition:
+            if cursor >= len(self.events) and not self.finished:
+                self.condition.wait(timeout)
+            return self.events[cursor:]
+
+
+class ProgressTracker:
+    """Thread-safe registry of in-flight reconciliation jobs"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        # Signalled whenever a job is registered, so subscribers need not poll
+        self.job_started = threading.Condition(self.lock)
+
+    def start(self, job_id):
+        """Register a new job; a job_id that is still running is rejected with ValueError"""
+        with self.lock:
+            self._expire()
+            job = self.jobs.get(job_id)
+            if job is not None and not job.finished:
+                raise ValueError(f'Job {job_id} is already running')
+            job = ProgressJob(job_id)
+            self.jobs[job_id] = job
+            self.job_started.notify_all()
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def wait_for_job(self, job_id, timeout):
+        """Return the job for `job_id`, blocking up to `timeout` seconds for it to start"""
+        with self.job_started:
+            self.job_started.wait_for(lambda: job_id in self.jobs, timeout)
+            return self.jobs.get(job_id)
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and now - job.finished_at > JOB_RETENTION
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+progress_tracker = ProgressTracker()
+
+
+def format_sse(event):
+    return f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+
+def stream_events(job_id, heartbeat=HEARTBEAT_INTERVAL):
+    """Yield SSE frames for `job_id`, replaying past events, until the job finishes"""
+    # The client usually subscribes before its upload request arrives
+    job = progress_tracker.wait_for_job(job_id, JOB_WAIT_TIMEOUT)
+    if job is None:
+        return
+
+    cursor = 0
+    while True:
+        events = job.wait_for(cursor, heartbeat)
+        if not events:
+            if job.finished:
+                return
+            yield ': heartbeat\n\n'
+            continue
+        for event in events:
+            yield format_sse(event)
+        cursor += len(events)
+        if events[-1]['stage'] in TERMINAL_STAGES:
+            return
+
+
+@progress_bp.route('/progress/<job_id>', methods=['GET'])
+def progress_stream(job_id):
+    return Response(
+        stream_with_context(stream_events(job_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
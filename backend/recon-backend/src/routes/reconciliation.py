@@ -4,25 +4,75 @@ import json
 import numpy as np
 from flask import Blueprint, request, jsonify, send_file, session
 from werkzeug.utils import secure_filename
-from io import StringIO
+from io import BytesIO, StringIO
+from collections import OrderedDict
 import tempfile
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
+import threading
+import uuid
+import zipfile
+from .progress import progress_tracker
+from .dates import parse_dates, to_utc_timestamp
+from .rules import load_rules
 
 reconciliation_bp = Blueprint('reconciliation', __name__)
 
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv'}
 
+# Results kept for export, oldest evicted first
+CACHE_MAX_ENTRIES = int(os.environ.get('RECON_CACHE_SIZE', 32))
+
+class ResultCache:
+    """Lock-protected LRU of reconciliation results keyed by session id"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, session_id, result):
+        with self._lock:
+            self._results[session_id] = result
+            self._results.move_to_end(session_id)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def get(self, session_id):
+        with self._lock:
+            result = self._results.get(session_id)
+            if result is not None:
+                self._results.move_to_end(session_id)
+            return result
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
 # Store reconciliation results in memory (in production, use Redis or database)
-reconciliation_cache = {}
+reconciliation_cache = ResultCache()
+
+# Parsed transaction_date as int64 epoch nanoseconds, added during ingest.
+# Underscored so it cannot collide with a column from an uploaded file.
+DATE_INDEX_COLUMN = '_transaction_epoch'
+NAT_EPOCH = np.iinfo(np.int64).min
+
+# scikit-learn dominates cold start, so it is imported on first use
+_anomaly_models = None
+
+def load_anomaly_models():
+    """Import and return (IsolationForest, StandardScaler), loading scikit-learn once"""
+    global _anomaly_models
+    if _anomaly_models is None:
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        _anomaly_models = (IsolationForest, StandardScaler)
+    return _anomaly_models
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def ensure_upload_folder():
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def map_columns(headers):
     """Enhanced AI-driven column mapping based on header analysis"""
@@ -63,11 +113,127 @@ def map_columns(headers):
     
     return mappings
 
-def detect_anomalies(matched_df):
-    """Detect anomalies in matched transactions using machine learning"""
+def apply_column_mappings(df, mappings):
+    """Rename source headers to their mapped names; map_columns returns {mapped: source}
+
+    A rename whose target is already a column is skipped, so a file with both
+    `amount` and `total_amount` keeps a single `amount` column.
+    """
+    if not mappings:
+        return df
+    renames = {
+        source: mapped for mapped, source in mappings.items()
+        if source != mapped and mapped not in df.columns
+    }
+    return df.rename(columns=renames)
+
+def index_transaction_dates(df):
+    """Parse transaction_date into int64 epoch nanoseconds and sort rows by it
+
+    The parsed values go in DATE_INDEX_COLUMN; unparseable dates become NAT_EPOCH
+    and sort first, so windows can be cut with a binary search.
+    """
+    if 'transaction_date' not in df.columns:
+        raise ValueError("transaction_date column not found; date windows and settlement lag need it")
+    parsed = parse_dates(df['transaction_date'])
+    epoch = parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[ns]').view('int64')
+    df = df.assign(**{DATE_INDEX_COLUMN: epoch})
+    return df.sort_values(DATE_INDEX_COLUMN, kind='stable').reset_index(drop=True)
+
+def _ensure_date_index(df):
+    if DATE_INDEX_COLUMN not in df.columns or not df[DATE_INDEX_COLUMN].is_monotonic_increasing:
+        return index_transaction_dates(df)
+    return df
+
+def count_undated(df):
+    """Rows of a date-indexed frame whose transaction_date could not be parsed"""
+    # Undated rows hold NAT_EPOCH and sort first
+    return int(np.searchsorted(df[DATE_INDEX_COLUMN].to_numpy(), NAT_EPOCH + 1, side='left'))
+
+def restrict_to_window(df, start=None, end=None):
+    """Slice a date-indexed frame to [start, end] epoch ns; undated rows are always excluded"""
+    df = _ensure_date_index(df)
+    epoch = df[DATE_INDEX_COLUMN].to_numpy()
+    low = np.searchsorted(epoch, NAT_EPOCH + 1 if start is None else start, side='left')
+    high = np.searchsorted(epoch, np.iinfo(np.int64).max if end is None else end, side='right')
+    return df.iloc[low:high]
+
+def _match_exact(internal_df, provider_df):
+    """Outer join on transaction_reference"""
+    merged = pd.merge(internal_df, provider_df, on='transaction_reference', how='outer', indicator=True, suffixes=('_internal', '_provider'))
+    
+    # Categorize transactions
+    matched = merged[merged['_merge'] == 'both'].copy()
+    
+    # Get original column names for filtering
+    internal_cols = [col for col in internal_df.columns if col in merged.columns]
+    provider_cols = [col for col in provider_df.columns if col in merged.columns]
+    
+    internal_only = merged[merged['_merge'] == 'left_only'][internal_cols].copy()
+    provider_only = merged[merged['_merge'] == 'right_only'][provider_cols].copy()
+    return matched, internal_only, provider_only
+
+def _claim_with_lag(internal_df, provider_df, lag_ns, by):
+    """One merge_asof pass; each provider row is claimed by at most one internal row"""
+    provider_rows = provider_df.assign(_provider_row=np.arange(len(provider_df)))
+    merged = pd.merge_asof(
+        internal_df,
+        provider_rows,
+        on=DATE_INDEX_COLUMN,
+        by=by,
+        direction='forward',
+        tolerance=lag_ns,
+        suffixes=('_internal', '_provider')
+    )
+    # merge_asof is a left join, so a provider row can be claimed twice; only the earliest keeps it
+    claimed = merged['_provider_row'].notna() & ~merged['_provider_row'].duplicated()
+    
+    matched = merged[claimed].drop(columns='_provider_row')
+    unclaimed = np.ones(len(provider_df), dtype=bool)
+    unclaimed[merged.loc[claimed, '_provider_row'].to_numpy(dtype='int64')] = False
+    
+    return matched, internal_df[~claimed.to_numpy()], provider_df[unclaimed]
+
+def _match_with_lag(internal_df, provider_df, lag_ns):
+    """Match internal rows to provider rows with the same reference dated between
+    the internal date and `lag_ns` later. Both frames must be date-sorted.
+
+    Repeated references are paired in date order first (the n-th internal row
+    with the n-th provider row), then leftover rows are matched to the nearest
+    unclaimed provider row within the lag.
+    """
+    internal = internal_df.assign(_occurrence=internal_df.groupby('transaction_reference').cumcount())
+    provider = provider_df.assign(_occurrence=provider_df.groupby('transaction_reference').cumcount())
+    paired, internal_rest, provider_rest = _claim_with_lag(
+        internal, provider, lag_ns, ['transaction_reference', '_occurrence']
+    )
+    
+    internal_rest = internal_rest.drop(columns='_occurrence')
+    provider_rest = provider_rest.drop(columns='_occurrence')
+    if len(internal_rest) and len(provider_rest):
+        nearest, internal_rest, provider_rest = _claim_with_lag(
+            internal_rest, provider_rest, lag_ns, 'transaction_reference'
+        )
+        paired = pd.concat([paired.drop(columns='_occurrence'), nearest], ignore_index=True)
+    else:
+        paired = paired.drop(columns='_occurrence')
+    
+    matched = paired.sort_values(DATE_INDEX_COLUMN, kind='stable', ignore_index=True)
+    matched['_merge'] = 'both'
+    return matched, internal_rest.copy(), provider_rest.copy()
+
+def detect_anomalies(matched_df, rules=None):
+    """Detect anomalies in matched transactions using machine learning
+
+    Risk policy comes from `rules` (a compiled RuleSet), defaulting to the
+    active rules file. Per-rule hit counts are left in matched_df.attrs['rule_hits'].
+    """
     if matched_df.empty:
         return matched_df
     
+    if rules is None:
+        rules = load_rules()
+    
     # Initialize anomaly flags
     matched_df['anomaly'] = False
     matched_df['amount_variance'] = 0.0
@@ -81,15 +247,11 @@ def detect_anomalies(matched_df):
             matched_df['amount_internal'].replace(0, 1)  # Avoid division by zero
         ) * 100
         
-        # Flag high variance transactions (>5%)
-        high_variance = matched_df['amount_variance'] > 5
-        matched_df.loc[high_variance, 'risk_level'] = 'High'
-        matched_df.loc[high_variance, 'anomaly'] = True
-        
         # Use Isolation Forest for anomaly detection on amounts
         try:
             amounts = matched_df[['amount_internal', 'amount_provider']].fillna(0)
             if len(amounts) > 1:
+                IsolationForest, StandardScaler = load_anomaly_models()
                 scaler = StandardScaler()
                 amounts_scaled = scaler.fit_transform(amounts)
                 
@@ -103,50 +265,84 @@ def detect_anomalies(matched_df):
         except Exception as e:
             print(f"ML anomaly detection failed: {e}")
     
-    # Status mismatch analysis
-    if 'status_internal' in matched_df.columns and 'status_provider' in matched_df.columns:
-        status_mismatch = matched_df['status_internal'] != matched_df['status_provider']
-        
-        # Define critical status mismatches
-        critical_mismatches = [
-            ('Processed', 'Failed'),
-            ('Completed', 'Pending'),
-            ('Success', 'Error'),
-            ('Approved', 'Rejected')
-        ]
-        
-        for internal_status, provider_status in critical_mismatches:
-            critical_mask = (
-                (matched_df['status_internal'].str.contains(internal_status, case=False, na=False)) &
-                (matched_df['status_provider'].str.contains(provider_status, case=False, na=False))
-            ) | (
-                (matched_df['status_internal'].str.contains(provider_status, case=False, na=False)) &
-                (matched_df['status_provider'].str.contains(internal_status, case=False, na=False))
-            )
-            
-            matched_df.loc[critical_mask, 'anomaly'] = True
-            matched_df.loc[critical_mask, 'risk_level'] = 'High'
+    # Variance thresholds, critical status mismatches and other policy rules
+    risk_level, anomaly, rule_hits = rules.evaluate(
+        matched_df,
+        risk_level=matched_df['risk_level'],
+        anomaly=matched_df['anomaly']
+    )
+    matched_df['risk_level'] = risk_level
+    matched_df['anomaly'] = anomaly
+    matched_df.attrs['rule_hits'] = rule_hits
     
     return matched_df
 
-def reconcile_transactions(internal_df, provider_df):
-    """Perform transaction reconciliation with AI enhancements"""
+def reconcile_transactions(internal_df, provider_df, progress=None, rules=None, window=None, settlement_lag=None):
+    """Perform transaction reconciliation with AI enhancements
+
+    `progress` is an optional ProgressJob that receives stage transitions;
+    `rules` is an optional RuleSet overriding the active rules file.
+
+    `window` is an optional (start, end) pair of dates, either side may be None;
+    a date-only end includes that whole day. `settlement_lag` is an optional
+    timedelta: provider rows may then be dated up to that much after their
+    internal counterpart and the provider window is extended by it. With either
+    option, rows outside the window or without a parseable transaction_date are
+    skipped before matching and counted in summary['skipped'] under
+    'out_of_window' and 'undated'.
+    """
     # Ensure transaction_reference exists in both dataframes
     if 'transaction_reference' not in internal_df.columns or 'transaction_reference' not in provider_df.columns:
         raise ValueError("transaction_reference column not found in one or both files")
     
-    # Perform outer merge
-    merged = pd.merge(internal_df, provider_df, on='transaction_reference', how='outer', indicator=True, suffixes=('_internal', '_provider'))
+    skipped = None
+    if window is not None or settlement_lag is not None:
+        start, end = window if window is not None else (None, None)
+        start = to_utc_timestamp(start).value if start is not None else None
+        if end is not None:
+            end_timestamp = to_utc_timestamp(end)
+            end = end_timestamp.value
+            if end_timestamp == end_timestamp.normalize():
+                end += pd.Timedelta(days=1).value - 1
+        lag_ns = pd.Timedelta(settlement_lag).value if settlement_lag is not None else 0
+        if lag_ns < 0:
+            raise ValueError("settlement_lag must not be negative")
+        
+        internal_df = _ensure_date_index(internal_df)
+        provider_df = _ensure_date_index(provider_df)
+        windowed_internal = restrict_to_window(internal_df, start, end)
+        provider_end = min(end + lag_ns, np.iinfo(np.int64).max) if end is not None else None
+        windowed_provider = restrict_to_window(provider_df, start, provider_end)
+        undated = {'internal': count_undated(internal_df), 'provider': count_undated(provider_df)}
+        skipped = {
+            'undated': undated,
+            'out_of_window': {
+                'internal': len(internal_df) - len(windowed_internal) - undated['internal'],
+                'provider': len(provider_df) - len(windowed_provider) - undated['provider']
+            }
+        }
+        internal_df, provider_df = windowed_internal, windowed_provider
     
-    # Categorize transactions
-    matched = merged[merged['_merge'] == 'both'].copy()
+    if settlement_lag is not None:
+        matched, internal_only, provider_only = _match_with_lag(internal_df, provider_df, lag_ns)
+    else:
+        matched, internal_only, provider_only = _match_exact(internal_df, provider_df)
     
-    # Get original column names for filtering
-    internal_cols = [col for col in internal_df.columns if col in merged.columns]
-    provider_cols = [col for col in provider_df.columns if col in merged.columns]
+    # The epoch index is an internal helper, not part of the results
+    if skipped is not None:
+        index_columns = [DATE_INDEX_COLUMN, f'{DATE_INDEX_COLUMN}_internal', f'{DATE_INDEX_COLUMN}_provider']
+        matched, internal_only, provider_only = (
+            frame.drop(columns=index_columns, errors='ignore')
+            for frame in (matched, internal_only, provider_only)
+        )
     
-    internal_only = merged[merged['_merge'] == 'left_only'][internal_cols].copy()
-    provider_only = merged[merged['_merge'] == 'right_only'][provider_cols].copy()
+    if progress is not None:
+        progress.publish(
+            'merge_done',
+            matched=len(matched),
+            internal_only=len(internal_only),
+            provider_only=len(provider_only)
+        )
     
     # Add match flags for matched transactions
     if not matched.empty:
@@ -161,7 +357,19 @@ def reconcile_transactions(internal_df, provider_df):
             matched['status_match'] = True
         
         # Apply AI anomaly detection
-        matched = detect_anomalies(matched)
+        matched = detect_anomalies(matched, rules=rules)
+    
+    if progress is not None:
+        progress.publish(
+            'anomalies_scored',
+            matched=len(matched),
+            anomalies=int(matched['anomaly'].sum()) if not matched.empty else 0
+        )
+    
+    rule_hits = matched.attrs.get('rule_hits')
+    if rule_hits is None:
+        # Nothing was scored; still report every rule so the summary keeps its shape
+        rule_hits = {rule.name: 0 for rule in (rules if rules is not None else load_rules()).rules}
     
     # Calculate enhanced summary statistics
     summary = {
@@ -171,8 +379,11 @@ def reconcile_transactions(internal_df, provider_df):
         'anomalies': len(matched[matched['anomaly'] == True]) if not matched.empty else 0,
         'high_risk': len(matched[matched['risk_level'] == 'High']) if not matched.empty else 0,
         'amount_mismatches': len(matched[matched['amount_match'] == False]) if not matched.empty else 0,
-        'status_mismatches': len(matched[matched['status_match'] == False]) if not matched.empty else 0
+        'status_mismatches': len(matched[matched['status_match'] == False]) if not matched.empty else 0,
+        'rule_hits': rule_hits
     }
+    if skipped is not None:
+        summary['skipped'] = skipped
     
     return {
         'matched': matched.to_dict('records'),
@@ -183,6 +394,13 @@ def reconcile_transactions(internal_df, provider_df):
 
 @reconciliation_bp.route('/upload_and_reconcile', methods=['POST'])
 def upload_and_reconcile():
+    # Clients pick the job id up front so they can subscribe to /api/progress/<job_id>.
+    # The query string is read first: request.form waits for the whole body to upload.
+    job_id = request.args.get('job_id') or request.form.get('job_id') or uuid.uuid4().hex
+    try:
+        progress = progress_tracker.start(job_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
     try:
         ensure_upload_folder()
         
@@ -198,40 +416,72 @@ def upload_and_reconcile():
         if not (allowed_file(internal_file.filename) and allowed_file(provider_file.filename)):
             return jsonify({'error': 'Only CSV files are allowed'}), 400
         
-        # Save files
-        internal_filename = secure_filename('internal.csv')
-        provider_filename = secure_filename('provider.csv')
-        
-        internal_path = os.path.join(UPLOAD_FOLDER, internal_filename)
-        provider_path = os.path.join(UPLOAD_FOLDER, provider_filename)
-        
-        internal_file.save(internal_path)
-        provider_file.save(provider_path)
+        # Save files into a directory of their own so concurrent uploads never collide
+        with tempfile.TemporaryDirectory(dir=UPLOAD_FOLDER) as request_folder:
+            internal_path = os.path.join(request_folder, secure_filename('internal.csv'))
+            provider_path = os.path.join(request_folder, secure_filename('provider.csv'))
+            
+            internal_file.save(internal_path)
+            provider_file.save(provider_path)
+            progress.publish('upload_received')
+            
+            # Read CSV files
+            try:
+                internal_df = pd.read_csv(internal_path)
+                provider_df = pd.read_csv(provider_path)
+            except Exception as e:
+                progress.publish('failed', error=str(e))
+                return jsonify({'error': f'Error reading CSV files: {str(e)}'}), 400
         
-        # Read CSV files
-        try:
-            internal_df = pd.read_csv(internal_path)
-            provider_df = pd.read_csv(provider_path)
-        except Exception as e:
-            return jsonify({'error': f'Error reading CSV files: {str(e)}'}), 400
+        progress.publish('rows_parsed', internal=len(internal_df), provider=len(provider_df))
         
         # Apply enhanced column mapping
         internal_mappings = map_columns(internal_df.columns.tolist())
         provider_mappings = map_columns(provider_df.columns.tolist())
         
         # Rename columns based on mappings
-        if internal_mappings:
-            internal_df = internal_df.rename(columns=internal_mappings)
-        if provider_mappings:
-            provider_df = provider_df.rename(columns=provider_mappings)
+        internal_df = apply_column_mappings(internal_df, internal_mappings)
+        provider_df = apply_column_mappings(provider_df, provider_mappings)
+        
+        # Optional settlement window and lag tolerance
+        try:
+            window_start = request.form.get('window_start')
+            window_end = request.form.get('window_end')
+            window = None
+            if window_start or window_end:
+                window = (
+                    pd.Timestamp(window_start) if window_start else None,
+                    pd.Timestamp(window_end) if window_end else None
+                )
+            lag_days = request.form.get('settlement_lag_days')
+            settlement_lag = None
+            if lag_days:
+                lag_days = float(lag_days)
+                if not np.isfinite(lag_days) or lag_days < 0:
+                    raise ValueError("settlement_lag_days must be a non-negative number of days")
+                settlement_lag = pd.Timedelta(days=lag_days)
+            
+            # Index dates on ingest so windows are cut by binary search before the merge
+            if window is not None or settlement_lag is not None:
+                internal_df = index_transaction_dates(internal_df)
+                provider_df = index_transaction_dates(provider_df)
+        except (ValueError, OverflowError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        progress.publish('mapping_done', internal=len(internal_df), provider=len(provider_df))
         
         # Perform reconciliation with AI enhancements
-        result = reconcile_transactions(internal_df, provider_df)
+        result = reconcile_transactions(
+            internal_df,
+            provider_df,
+            progress=progress,
+            window=window,
+            settlement_lag=settlement_lag
+        )
         
-        # Store result in cache for export functionality
-        session_id = request.remote_addr + str(hash(str(result)))
-        reconciliation_cache[session_id] = result
+        session_id = uuid.uuid4().hex
         result['session_id'] = session_id
+        result['job_id'] = job_id
         
         # Add column mapping information to response
         result['column_mappings'] = {
@@ -239,10 +489,28 @@ def upload_and_reconcile():
             'provider': provider_mappings
         }
         
-        return jsonify(result)
+        # Store the finished result in cache for export functionality
+        reconciliation_cache.put(session_id, result)
+        summary = result['summary']
+        progress.publish(
+            'stored',
+            matched=summary['matched'],
+            internal_only=summary['internal_only'],
+            provider_only=summary['provider_only'],
+            anomalies=summary['anomalies']
+        )
+        
+        response = jsonify(result)
+        progress.publish('complete')
+        return response
         
     except Exception as e:
+        progress.publish('failed', error=str(e))
         return jsonify({'error': str(e)}), 500
+    finally:
+        # Validation failures return early; make sure subscribers are released
+        if not progress.finished:
+            progress.publish('failed', error='Reconciliation did not complete')
 
 @reconciliation_bp.route('/export_csv', methods=['GET'])
 def export_csv():
@@ -253,11 +521,11 @@ def export_csv():
         if not category:
             return jsonify({'error': 'Category parameter is required'}), 400
         
-        if not session_id or session_id not in reconciliation_cache:
+        # Single lookup: the entry could be evicted between a check and a read
+        data = reconciliation_cache.get(session_id) if session_id else None
+        if data is None:
             return jsonify({'error': 'No reconciliation data found. Please perform reconciliation first.'}), 400
         
-        data = reconciliation_cache[session_id]
-        
         if category not in data:
             return jsonify({'error': f'Invalid category: {category}'}), 400
         
@@ -267,15 +535,13 @@ def export_csv():
         if df.empty:
             return jsonify({'error': f'No data available for category: {category}'}), 400
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv')
-        df.to_csv(temp_file.name, index=False)
-        temp_file.close()
+        # Build the file in memory so concurrent exports share no temporary paths
+        csv_buffer = BytesIO(df.to_csv(index=False).encode('utf-8'))
         
         filename = f'{category}_transactions.csv'
         
         return send_file(
-            temp_file.name,
+            csv_buffer,
             as_attachment=True,
             download_name=filename,
             mimetype='text/csv'
@@ -289,33 +555,22 @@ def export_all():
     try:
         session_id = request.args.get('session_id')
         
-        if not session_id or session_id not in reconciliation_cache:
+        # Single lookup: the entry could be evicted between a check and a read
+        data = reconciliation_cache.get(session_id) if session_id else None
+        if data is None:
             return jsonify({'error': 'No reconciliation data found. Please perform reconciliation first.'}), 400
         
-        data = reconciliation_cache[session_id]
-        
-        # Create a temporary directory for multiple CSV files
-        temp_dir = tempfile.mkdtemp()
-        
-        # Export each category to separate CSV files
-        for category in ['matched', 'internal_only', 'provider_only']:
-            if data[category]:
-                df = pd.DataFrame(data[category])
-                csv_path = os.path.join(temp_dir, f'{category}_transactions.csv')
-                df.to_csv(csv_path, index=False)
-        
-        # Create a zip file containing all CSVs
-        import zipfile
-        zip_path = os.path.join(temp_dir, 'reconciliation_results.zip')
-        
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
+        # Create a zip file containing a CSV per non-empty category, in memory
+        zip_buffer = BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zipf:
             for category in ['matched', 'internal_only', 'provider_only']:
-                csv_path = os.path.join(temp_dir, f'{category}_transactions.csv')
-                if os.path.exists(csv_path):
-                    zipf.write(csv_path, f'{category}_transactions.csv')
+                if data[category]:
+                    df = pd.DataFrame(data[category])
+                    zipf.writestr(f'{category}_transactions.csv', df.to_csv(index=False))
+        zip_buffer.seek(0)
         
         return send_file(
-            zip_path,
+            zip_buffer,
             as_attachment=True,
             download_name='reconciliation_results.zip',
             mimetype='application/zip'
@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from .dates import parse_dates, to_utc_timestamp
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'risk_rules.json')
+
+RISK_LEVELS = ['Low', 'Medium', 'High']
+
+COMPARISON_OPS = {'==', '!=', '>', '>=', '<', '<='}
+ORDERING_OPS = COMPARISON_OPS - {'==', '!='}
+STRING_OPS = {'contains', 'startswith', 'endswith'}
+SET_OPS = {'in', 'not_in'}
+NULL_OPS = {'is_null', 'not_null'}
+SUPPORTED_OPS = COMPARISON_OPS | STRING_OPS | SET_OPS | NULL_OPS | {'between'}
+
+# Compiled rule sets keyed by the SHA-256 of their canonical JSON
+_compiled_rulesets = {}
+_compile_lock = threading.Lock()
+# Last rule set that loaded cleanly from each path, used when a reload fails
+_last_good_rulesets = {}
+
+
+class EvaluationContext:
+    """Per-DataFrame cache of column arrays shared by every rule in a rule set
+
+    String columns are factorized once, so string predicates run over the
+    distinct values and are broadcast back to rows through the codes.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+        self._numeric = {}
+        self._dates = {}
+        self._strings = {}
+
+    def has(self, field):
+        return field in self.df.columns
+
+    def numeric(self, field):
+        if field not in self._numeric:
+            self._numeric[field] = pd.to_numeric(self.df[field], errors='coerce').to_numpy(dtype='float64')
+        return self._numeric[field]
+
+    def dates(self, field):
+        if field not in self._dates:
+            parsed = parse_dates(self.df[field])
+            self._dates[field] = parsed.dt.tz_localize(None).to_numpy()
+        return self._dates[field]
+
+    def strings(self, field):
+        """Return (codes, lowercased distinct values); null rows have code -1"""
+        if field not in self._strings:
+            column = self.df[field]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+            else:
+                codes, uniques = pd.factorize(column)
+            lowered = np.array([str(value).lower() for value in uniques], dtype=object)
+            self._strings[field] = (codes, lowered)
+        return self._strings[field]
+
+    def is_numeric(self, field):
+        return pd.api.types.is_numeric_dtype(self.df[field])
+
+
+def _broadcast(codes, unique_values, fill=False):
+    """Map per-distinct-value results back onto rows; null rows (code -1) get `fill`"""
+    # Appending `fill` lets code -1 index it directly, so this is a single gather
+    return np.append(unique_values, fill).astype(np.asarray(unique_values).dtype)[codes]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compare(left, op, right):
+    if op == '==':
+        return left == right
+    if op == '!=':
+        return left != right
+    if op == '>':
+        return left > right
+    if op == '>=':
+        return left >= right
+    if op == '<':
+        return left < right
+    return left <= right
+
+
+def _to_date(value, rule_name):
+    """Parse a rule literal to naive UTC, matching EvaluationContext.dates"""
+    if not isinstance(value, str):
+        raise ValueError(f"Rule '{rule_name}': date values must be strings, got {value!r}")
+    try:
+        return to_utc_timestamp(value).to_datetime64()
+    except ValueError:
+        raise ValueError(f"Rule '{rule_name}': cannot parse date {value!r}")
+
+
+def _compile_leaf(node, rule_name):
+    field = node.get('field')
+    op = node.get('op')
+    if not field:
+        raise ValueError(f"Rule '{rule_name}': condition is missing 'field'")
+    if op not in SUPPORTED_OPS:
+        raise ValueError(f"Rule '{rule_name}': unsupported operator '{op}'")
+
+    if node.get('as') not in (None, 'date'):
+        raise ValueError(f"Rule '{rule_name}': 'as' only supports \"date\"")
+    as_date = node.get('as') == 'date'
+    other = node.get('other')
+    value = node.get('value')
+    if other is not None and not isinstance(other, str):
+        raise ValueError(f"Rule '{rule_name}': 'other' must be a field name")
+
+    if op in NULL_OPS:
+        def evaluate(ctx):
+            if not ctx.has(field):
+                return np.full(ctx.size, op == 'is_null')
+            nulls = ctx.df[field].isna().to_numpy()
+            return nulls if op == 'is_null' else ~nulls
+        return evaluate
+
+    # Column against column, e.g. currency_internal != currency_provider
+    if other is not None:
+        if op not in COMPARISON_OPS:
+            raise ValueError(f"Rule '{rule_name}': '{op}' cannot compare two fields")
+
+        def evaluate(ctx):
+            if not (ctx.has(field) and ctx.has(other)):
+                return np.zeros(ctx.size, dtype=bool)
+            if as_date:
+                left, right = ctx.dates(field), ctx.dates(other)
+                valid = ~(np.isnat(left) | np.isnat(right))
+            elif op in ORDERING_OPS or (ctx.is_numeric(field) and ctx.is_numeric(other)):
+                # Ordering is numeric; values that are not numbers never match
+                left, right = ctx.numeric(field), ctx.numeric(other)
+                valid = ~(np.isnan(left) | np.isnan(right))
+            else:
+                # Recode both sides into one shared vocabulary and compare integer codes
+                left_codes, left_uniques = ctx.strings(field)
+                right_codes, right_uniques = ctx.strings(other)
+                vocabulary = pd.Index(np.concatenate([left_uniques, right_uniques])).unique()
+                left = _broadcast(left_codes, vocabulary.get_indexer(left_uniques), fill=-1)
+                right = _broadcast(right_codes, vocabulary.get_indexer(right_uniques), fill=-1)
+                valid = (left >= 0) & (right >= 0)
+            return _compare(left, op, right) & valid
+        return evaluate
+
+    if op == 'between':
+        if not (isinstance(value, list) and len(value) == 2):
+            raise ValueError(f"Rule '{rule_name}': 'between' needs a [low, high] value")
+        if as_date:
+            low, high = (_to_date(bound, rule_name) for bound in value)
+        elif all(_is_number(bound) for bound in value):
+            low, high = value
+        else:
+            raise ValueError(f"Rule '{rule_name}': 'between' needs numeric bounds or \"as\": \"date\"")
+
+        def evaluate(ctx):
+            if not ctx.has(field):
+                return np.zeros(ctx.size, dtype=bool)
+            if as_date:
+                column = ctx.dates(field)
+                return (column >= low) & (column <= high)
+            column = ctx.numeric(field)
+            return (column >= low) & (column <= high)
+        return evaluate
+
+    if op in STRING_OPS:
+        if not isinstance(value, str):
+            raise ValueError(f"Rule '{rule_name}': '{op}' needs a string value")
+        needle = value.lower()
+
+        def evaluate(ctx):
+            if not ctx.has(field):
+                return np.zeros(ctx.size, dtype=bool)
+            codes, uniques = ctx.strings(field)
+            method = {'contains': str.__contains__, 'startswith': str.startswith, 'endswith': str.endswith}[op]
+            return _broadcast(codes, np.array([method(item, needle) for item in uniques], dtype=bool))
+        return evaluate
+
+    if op in SET_OPS:
+        if not isinstance(value, list) or any(isinstance(item, (list, dict)) or item is None for item in value):
+            raise ValueError(f"Rule '{rule_name}': '{op}' needs a list of values")
+        numeric_values = all(_is_number(item) for item in value)
+        lowered = {str(item).lower() for item in value}
+
+        def evaluate(ctx):
+            if not ctx.has(field):
+                return np.zeros(ctx.size, dtype=bool)
+            if numeric_values and ctx.is_numeric(field):
+                column = ctx.numeric(field)
+                hits = np.isin(column, value)
+                return hits if op == 'in' else ~hits & ~np.isnan(column)
+            codes, uniques = ctx.strings(field)
+            member = np.array([item in lowered for item in uniques], dtype=bool)
+            return _broadcast(codes, member if op == 'in' else ~member)
+        return evaluate
+
+    # Single comparison against a literal
+    if as_date:
+        value = _to_date(value, rule_name)
+    elif value is None or isinstance(value, (list, dict)):
+        raise ValueError(f"Rule '{rule_name}': '{op}' needs a single value")
+    elif op in ORDERING_OPS and not _is_number(value):
+        raise ValueError(f"Rule '{rule_name}': '{op}' needs a numeric value or \"as\": \"date\"")
+
+    def evaluate(ctx):
+        if not ctx.has(field):
+            return np.zeros(ctx.size, dtype=bool)
+        if as_date:
+            column = ctx.dates(field)
+            return _compare(column, op, value) & ~np.isnat(column)
+        if _is_number(value):
+            column = ctx.numeric(field)
+            return _compare(column, op, value) & ~np.isnan(column)
+        codes, uniques = ctx.strings(field)
+        return _broadcast(codes, _compare(uniques, op, str(value).lower()).astype(bool))
+    return evaluate
+
+
+def compile_condition(node, rule_name):
+    """Compile a condition tree into a function of EvaluationContext returning a boolean mask"""
+    if not isinstance(node, dict):
+        raise ValueError(f"Rule '{rule_name}': conditions must be objects")
+    if 'all' in node or 'any' in node:
+        combinator = 'all' if 'all' in node else 'any'
+        if not isinstance(node[combinator], list):
+            raise ValueError(f"Rule '{rule_name}': '{combinator}' needs a list of conditions")
+        children = [compile_condition(child, rule_name) for child in node[combinator]]
+        reduce = np.logical_and if combinator == 'all' else np.logical_or
+
+        def evaluate(ctx):
+            mask = np.full(ctx.size, combinator == 'all')
+            for child in children:
+                reduce(mask, child(ctx), out=mask)
+            return mask
+        return evaluate
+    if 'not' in node:
+        child = compile_condition(node['not'], rule_name)
+        return lambda ctx: ~child(ctx)
+    return _compile_leaf(node, rule_name)
+
+
+class CompiledRule:
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise ValueError('Every rule must be an object')
+        self.name = spec.get('name')
+        if not self.name:
+            raise ValueError('Every rule needs a name')
+        if 'when' not in spec:
+            raise ValueError(f"Rule '{self.name}': missing 'when' condition")
+        self.risk_level = spec.get('risk_level', 'High')
+        if self.risk_level not in RISK_LEVELS:
+            raise ValueError(f"Rule '{self.name}': risk_level must be one of {RISK_LEVELS}")
+        self.rank = RISK_LEVELS.index(self.risk_level)
+        self.anomaly = bool(spec.get('anomaly', True))
+        self.mask = compile_condition(spec['when'], self.name)
+
+
+class RuleSet:
+    """Rules compiled once into vectorized mask functions"""
+
+    def __init__(self, spec, rule_hash):
+        self.hash = rule_hash
+        rules = spec.get('rules') if isinstance(spec, dict) else None
+        if not isinstance(rules, list):
+            raise ValueError("Rules file must contain a 'rules' list")
+        self.rules = [CompiledRule(rule) for rule in rules]
+        names = [rule.name for rule in self.rules]
+        if len(names) != len(set(names)):
+            raise ValueError('Rule names must be unique')
+
+    def evaluate(self, df, risk_level=None, anomaly=None):
+        """Apply every rule to `df`
+
+        Returns (risk_level, anomaly, hits): risk levels only escalate, so a
+        row keeps the highest level among its existing value and its matching rules.
+        """
+        ctx = EvaluationContext(df)
+        ranks = np.zeros(ctx.size, dtype=np.int8)
+        if risk_level is not None:
+            ranks = pd.Series(risk_level).map({level: rank for rank, level in enumerate(RISK_LEVELS)}).fillna(0).to_numpy(dtype=np.int8)
+        flags = np.zeros(ctx.size, dtype=bool) if anomaly is None else np.asarray(anomaly, dtype=bool).copy()
+
+        # Union the matches per risk level, then escalate once per level
+        level_masks = {}
+        hits = {}
+        for rule in self.rules:
+            mask = rule.mask(ctx)
+            hits[rule.name] = int(np.count_nonzero(mask))
+            if rule.rank:
+                if rule.rank in level_masks:
+                    level_masks[rule.rank] |= mask
+                else:
+                    level_masks[rule.rank] = mask.copy()
+            if rule.anomaly:
+                flags |= mask
+        for rank, mask in level_masks.items():
+            np.maximum(ranks, rank, out=ranks, where=mask)
+        levels = np.array(RISK_LEVELS, dtype=object)[ranks]
+        return levels, flags, hits
+
+
+def compile_rules(spec):
+    """Return the compiled RuleSet for a parsed rules document, reusing it by content hash"""
+    # default=str covers values YAML parses into objects, such as unquoted dates
+    rule_hash = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+    with _compile_lock:
+        ruleset = _compiled_rulesets.get(rule_hash)
+        if ruleset is None:
+            ruleset = RuleSet(spec, rule_hash)
+            _compiled_rulesets[rule_hash] = ruleset
+    return ruleset
+
+
+def parse_rules(text, filename='rules.json'):
+    if filename.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError('PyYAML is required for YAML rules files')
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f'Invalid YAML: {e}')
+    return json.loads(text)
+
+
+def load_rules(path=None):
+    """Load and compile the active rules file
+
+    The file is re-read on each call, so policy edits apply without a
+    restart; unchanged content hits the compiled cache. If a reload fails,
+    the last rule set that loaded from the same path stays in force.
+    """
+    path = path or os.environ.get('RECON_RULES_FILE') or DEFAULT_RULES_FILE
+    try:
+        with open(path) as rules_file:
+            ruleset = compile_rules(parse_rules(rules_file.read(), path))
+    except (OSError, ValueError) as e:
+        with _compile_lock:
+            last_good = _last_good_rulesets.get(path)
+        if last_good is None:
+            raise ValueError(f'Invalid rules file {path}: {e}')
+        print(f"Rules reload failed, keeping previous rules: {e}")
+        return last_good
+    with _compile_lock:
+        _last_good_rulesets[path] = ruleset
+    return ruleset
@@ -0,0 +1,6 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Production entry point: gunicorn -c gunicorn.conf.py src.wsgi:app
+from src.main import app
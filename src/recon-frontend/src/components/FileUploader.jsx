@@ -5,11 +5,28 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Upload, FileText, AlertCircle } from 'lucide-react';
 import axios from 'axios';
 
+const API_BASE = 'http://localhost:5000/api';
+
+const STAGE_LABELS = {
+  upload_received: 'Upload received',
+  rows_parsed: 'Rows parsed',
+  mapping_done: 'Columns mapped',
+  merge_done: 'Transactions merged',
+  anomalies_scored: 'Anomalies scored',
+  stored: 'Results stored',
+};
+
+const createJobId = () =>
+  typeof crypto !== 'undefined' && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+
 const FileUploader = ({ onReconciliationComplete }) => {
   const [internalFile, setInternalFile] = useState(null);
   const [providerFile, setProviderFile] = useState(null);
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState('');
+  const [progress, setProgress] = useState(null);
 
   const onDropInternal = useCallback((acceptedFiles) => {
     const file = acceptedFiles[0];
@@ -65,13 +82,30 @@ const FileUploader = ({ onReconciliationComplete }) => {
 
     setUploading(true);
     setError('');
+    setProgress(null);
 
+    const jobId = createJobId();
     const formData = new FormData();
     formData.append('internal_file', internalFile);
     formData.append('provider_file', providerFile);
 
+    // Subscribe before posting so no stage transition is missed
+    let events = null;
+    if (typeof EventSource !== 'undefined') {
+      events = new EventSource(`${API_BASE}/progress/${jobId}`);
+      Object.keys(STAGE_LABELS).forEach((stage) => {
+        events.addEventListener(stage, (message) => setProgress(JSON.parse(message.data)));
+      });
+      // The native 'error' event is left alone so EventSource can reconnect
+      ['complete', 'failed'].forEach((stage) => {
+        events.addEventListener(stage, () => events.close());
+      });
+    }
+
     try {
-      const response = await axios.post('http://localhost:5000/api/upload_and_reconcile', formData, {
+      // job_id goes in the query string so progress is registered before the body uploads
+      const response = await axios.post(`${API_BASE}/upload_and_reconcile`, formData, {
+        params: { job_id: jobId },
         headers: {
           'Content-Type': 'multipart/form-data',
         },
@@ -81,7 +115,11 @@ const FileUploader = ({ onReconciliationComplete }) => {
     } catch (err) {
       setError(err.response?.data?.error || 'Upload failed');
     } finally {
+      if (events) {
+        events.close();
+      }
       setUploading(false);
+      setProgress(null);
     }
   };
 
@@ -160,6 +198,12 @@ const FileUploader = ({ onReconciliationComplete }) => {
             </div>
           )}
 
+          {uploading && progress && (
+            <div className="text-sm text-gray-600 bg-gray-50 p-3 rounded-lg">
+              {STAGE_LABELS[progress.stage]} ({(progress.elapsed_ms / 1000).toFixed(1)}s)
+            </div>
+          )}
+
           <Button
             onClick={handleUpload}
             disabled={!internalFile || !providerFile || uploading}
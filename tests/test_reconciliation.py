@@ -3,6 +3,7 @@ import pandas as pd
 import json
 import tempfile
 import os
+import io
 from io import StringIO
 import sys
 
@@ -13,8 +14,15 @@ from routes.reconciliation import (
     map_columns, 
     reconcile_transactions, 
     detect_anomalies,
-    allowed_file
+    allowed_file,
+    apply_column_mappings,
+    index_transaction_dates,
+    restrict_to_window,
+    reconciliation_bp,
+    ResultCache
 )
+from routes.progress import ProgressTracker, progress_tracker, stream_events
+from routes.rules import compile_rules, load_rules
 
 class TestColumnMapping:
     """Test cases for AI-driven column mapping functionality"""
@@ -274,6 +282,531 @@ class TestFileValidation:
         assert allowed_file('data.backup.csv') == True
         assert allowed_file('file.csv.txt') == False
 
+class TestRulesEngine:
+    """Test cases for declarative risk rules"""
+    
+    def setup_method(self):
+        """Set up matched transactions covering amounts, statuses, dates and currency"""
+        self.matched = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN003', 'TXN004'],
+            'amount_internal': [100.0, 200.0, 300.0, None],
+            'amount_provider': [100.0, 200.0, 330.0, 50.0],
+            'status_internal': ['Completed', 'pending', None, 'Failed'],
+            'status_provider': ['Completed', 'Completed', 'Failed', 'Failed'],
+            'transaction_currency_internal': ['USD', 'usd', 'EUR', 'KES'],
+            'transaction_currency_provider': ['USD', 'USD', 'USD', None],
+            'transaction_date_internal': ['2024-01-01', '2024-01-15', '2024-02-01', 'not a date']
+        })
+    
+    def hits_for(self, when, name='rule'):
+        ruleset = compile_rules({'rules': [{'name': name, 'when': when}]})
+        _, anomaly, hits = ruleset.evaluate(self.matched)
+        return anomaly.tolist(), hits[name]
+    
+    def test_numeric_comparison_skips_nulls(self):
+        """Test numeric conditions never match missing values"""
+        anomaly, hits = self.hits_for({'field': 'amount_internal', 'op': '!=', 'value': 100})
+        
+        assert anomaly == [False, True, True, False]
+        assert hits == 2
+    
+    def test_string_conditions_are_case_insensitive(self):
+        """Test string membership and substring matching ignore case"""
+        anomaly, _ = self.hits_for({'field': 'status_internal', 'op': 'in', 'value': ['PENDING', 'failed']})
+        assert anomaly == [False, True, False, True]
+        
+        anomaly, _ = self.hits_for({'field': 'status_provider', 'op': 'contains', 'value': 'fail'})
+        assert anomaly == [False, False, True, True]
+    
+    def test_field_to_field_comparison(self):
+        """Test comparing currencies across the two sides"""
+        anomaly, _ = self.hits_for({
+            'field': 'transaction_currency_internal',
+            'op': '!=',
+            'other': 'transaction_currency_provider'
+        })
+        
+        assert anomaly == [False, False, True, False]
+    
+    def test_date_window_and_combinators(self):
+        """Test date ranges combined with boolean operators"""
+        anomaly, _ = self.hits_for({'all': [
+            {'field': 'transaction_date_internal', 'op': 'between', 'value': ['2024-01-10', '2024-02-28'], 'as': 'date'},
+            {'not': {'field': 'status_internal', 'op': 'is_null'}}
+        ]})
+        
+        assert anomaly == [False, True, False, False]
+    
+    def test_risk_levels_only_escalate(self):
+        """Test that the highest matching risk level wins and existing levels are kept"""
+        ruleset = compile_rules({'rules': [
+            {'name': 'medium', 'when': {'field': 'amount_provider', 'op': '>=', 'value': 200}, 'risk_level': 'Medium'},
+            {'name': 'high', 'when': {'field': 'amount_provider', 'op': '>', 'value': 300}, 'risk_level': 'High'},
+            {'name': 'watch', 'when': {'field': 'amount_provider', 'op': '<', 'value': 100}, 'risk_level': 'Low', 'anomaly': False}
+        ]})
+        
+        risk_level, anomaly, hits = ruleset.evaluate(
+            self.matched,
+            risk_level=pd.Series(['Low', 'Low', 'Low', 'Medium'])
+        )
+        
+        assert risk_level.tolist() == ['Low', 'Medium', 'High', 'Medium']
+        assert anomaly.tolist() == [False, True, True, False]
+        assert hits == {'medium': 2, 'high': 1, 'watch': 1}
+    
+    def test_compiled_rules_cached_by_content(self):
+        """Test that identical rule documents compile once"""
+        spec = {'rules': [{'name': 'big', 'when': {'field': 'amount_internal', 'op': '>', 'value': 1000}}]}
+        
+        assert compile_rules(spec) is compile_rules(json.loads(json.dumps(spec)))
+    
+    def test_invalid_rules_rejected(self):
+        """Test that malformed rules fail at compile time"""
+        with pytest.raises(ValueError, match="unsupported operator"):
+            compile_rules({'rules': [{'name': 'bad', 'when': {'field': 'amount', 'op': '~'}}]})
+        with pytest.raises(ValueError, match="risk_level"):
+            compile_rules({'rules': [{'name': 'bad', 'when': {'field': 'amount', 'op': 'is_null'}, 'risk_level': 'Severe'}]})
+    
+    def test_value_types_checked_at_compile_time(self):
+        """Test that rules which could only fail during evaluation are rejected up front"""
+        bad_conditions = [
+            {'field': 'amount_internal', 'op': '>', 'value': 'high'},
+            {'field': 'amount_internal', 'op': 'between', 'value': ['low', 'high']},
+            {'field': 'transaction_date_internal', 'op': '>=', 'value': 'someday', 'as': 'date'},
+            {'field': 'status_internal', 'op': 'contains', 'value': 5},
+            {'field': 'status_internal', 'op': '==', 'value': None}
+        ]
+        for when in bad_conditions:
+            with pytest.raises(ValueError):
+                compile_rules({'rules': [{'name': 'bad', 'when': when}]})
+    
+    def test_ordering_between_text_fields_never_matches(self):
+        """Test that ordering two non-numeric fields evaluates instead of failing"""
+        anomaly, _ = self.hits_for({'field': 'status_internal', 'op': '>', 'other': 'status_provider'})
+        
+        assert anomaly == [False, False, False, False]
+    
+    def test_date_rules_accept_mixed_formats(self):
+        """Test that date conditions parse every row, not just those shaped like the first"""
+        self.matched['transaction_date_internal'] = ['2024-01-31', '01/05/2024', '2024-01-20 10:00', None]
+        
+        anomaly, _ = self.hits_for({
+            'field': 'transaction_date_internal',
+            'op': 'between',
+            'value': ['2024-01-01', '2024-01-25'],
+            'as': 'date'
+        })
+        
+        assert anomaly == [False, True, True, False]
+    
+    def test_failed_reload_keeps_last_good_rules(self, tmp_path):
+        """Test that a broken policy edit does not take down reconciliation"""
+        rules_file = tmp_path / 'rules.json'
+        rules_file.write_text(json.dumps({'rules': [
+            {'name': 'big', 'when': {'field': 'amount_internal', 'op': '>', 'value': 250}}
+        ]}))
+        good = load_rules(str(rules_file))
+        
+        rules_file.write_text(json.dumps({'rules': [
+            {'name': 'big', 'when': {'field': 'amount_internal', 'op': '>', 'value': 'lots'}}
+        ]}))
+        assert load_rules(str(rules_file)) is good
+        
+        rules_file.write_text('{not json')
+        assert load_rules(str(rules_file)) is good
+        
+        with pytest.raises(ValueError, match="Invalid rules file"):
+            load_rules(str(tmp_path / 'missing.json'))
+    
+    def test_summary_reports_rule_hits(self):
+        """Test that reconciliation summary includes per-rule hit counts from the default rules"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002'],
+            'amount': [100.0, 200.0],
+            'status': ['Processed', 'Completed']
+        })
+        provider = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002'],
+            'amount': [100.0, 300.0],
+            'status': ['Failed', 'Completed']
+        })
+        
+        result = reconcile_transactions(internal, provider)
+        
+        assert result['summary']['rule_hits']['high_amount_variance'] == 1
+        assert result['summary']['rule_hits']['status_processed_vs_failed'] == 1
+        assert result['summary']['high_risk'] == 2
+    
+    def test_rule_hits_reported_without_matches(self):
+        """Test that every rule is reported with zero hits when nothing matched"""
+        internal = pd.DataFrame({'transaction_reference': ['TXN001'], 'amount': [100.0]})
+        provider = pd.DataFrame({'transaction_reference': ['TXN002'], 'amount': [100.0]})
+        
+        result = reconcile_transactions(internal, provider)
+        
+        assert result['summary']['rule_hits'] == {rule.name: 0 for rule in load_rules().rules}
+        assert result['summary']['rule_hits']
+
+class TestDateWindows:
+    """Test cases for date-windowed reconciliation and settlement lag"""
+    
+    def setup_method(self):
+        """Set up transactions that settle on the provider side a day or two later"""
+        self.internal_data = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN003', 'TXN004'],
+            'amount': [100.0, 200.0, 300.0, 400.0],
+            'transaction_date': ['2024-01-31', '2024-01-05', 'unknown', '2024-01-20']
+        })
+        
+        self.provider_data = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN003', 'TXN004'],
+            'amount': [100.0, 200.0, 300.0, 400.0],
+            'transaction_date': ['2024-02-01', '2024-01-08', '2024-01-10', '2024-01-19']
+        })
+    
+    def test_dates_indexed_as_sorted_epochs(self):
+        """Test that ingest parses dates into a sorted int64 epoch column"""
+        indexed = index_transaction_dates(self.internal_data)
+        
+        assert indexed['_transaction_epoch'].dtype == 'int64'
+        assert indexed['_transaction_epoch'].is_monotonic_increasing
+        # Unparseable dates sort first
+        assert indexed['transaction_reference'].tolist() == ['TXN003', 'TXN002', 'TXN004', 'TXN001']
+        assert indexed['_transaction_epoch'].iloc[1] == pd.Timestamp('2024-01-05').value
+    
+    def test_mixed_date_and_datetime_formats(self):
+        """Test that rows written in a different format from the first are still dated"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN003', 'TXN004'],
+            'transaction_date': ['2024-01-31', '01/05/2024', '2024-01-20 10:00', 'not a date']
+        })
+        provider = internal.assign(transaction_date=['2024-01-31T08:00:00Z', '2024-01-05', 'Jan 20 2024', None])
+        
+        indexed = index_transaction_dates(internal)
+        assert indexed['transaction_reference'].tolist() == ['TXN004', 'TXN002', 'TXN003', 'TXN001']
+        assert indexed['_transaction_epoch'].iloc[2] == pd.Timestamp('2024-01-20 10:00').value
+        
+        result = reconcile_transactions(internal, provider, settlement_lag='1D')
+        assert sorted(match['transaction_reference'] for match in result['matched']) == ['TXN001', 'TXN002']
+        assert result['summary']['skipped']['undated'] == {'internal': 1, 'provider': 1}
+    
+    def test_window_excludes_undated_rows(self):
+        """Test that windows cut by date and always drop undated rows"""
+        window = restrict_to_window(self.internal_data, end=pd.Timestamp('2024-01-20').value)
+        
+        assert window['transaction_reference'].tolist() == ['TXN002', 'TXN004']
+    
+    def test_window_reconciliation_skips_out_of_window_rows(self):
+        """Test reconciling a window with an inclusive end date"""
+        result = reconcile_transactions(
+            self.internal_data,
+            self.provider_data,
+            window=('2024-01-01', '2024-01-20')
+        )
+        
+        matched_refs = sorted(match['transaction_reference'] for match in result['matched'])
+        assert matched_refs == ['TXN002', 'TXN004']
+        assert result['summary']['provider_only'] == 1  # TXN003 dated inside the window
+        assert result['summary']['skipped'] == {
+            'undated': {'internal': 1, 'provider': 0},
+            'out_of_window': {'internal': 1, 'provider': 1}
+        }
+        assert not any(key.startswith('_transaction_epoch') for key in result['matched'][0])
+    
+    def test_user_timestamp_columns_preserved(self):
+        """Test that uploaded columns resembling the epoch index are kept as they are"""
+        internal = self.internal_data.assign(transaction_ts=[4, 3, 2, 1], transaction_tstamp_note='a')
+        provider = self.provider_data.assign(transaction_ts=[1, 2, 3, 4])
+        
+        exact = reconcile_transactions(internal, provider)
+        assert exact['matched'][0]['transaction_tstamp_note'] == 'a'
+        assert {'transaction_ts_internal', 'transaction_ts_provider'} <= exact['matched'][0].keys()
+        
+        windowed = reconcile_transactions(internal, provider, window=('2024-01-01', '2024-01-20'))
+        by_reference = {match['transaction_reference']: match for match in windowed['matched']}
+        assert by_reference['TXN002']['transaction_ts_internal'] == 3
+        assert by_reference['TXN002']['transaction_ts_provider'] == 2
+    
+    def test_settlement_lag_tolerance(self):
+        """Test that provider rows may settle up to the lag after the internal date"""
+        result = reconcile_transactions(
+            self.internal_data,
+            self.provider_data,
+            settlement_lag=pd.Timedelta(days=1)
+        )
+        
+        matched_refs = sorted(match['transaction_reference'] for match in result['matched'])
+        # TXN002 settles 3 days later and TXN004 is dated before its internal row
+        assert matched_refs == ['TXN001']
+        assert result['summary']['internal_only'] == 2
+        assert result['summary']['provider_only'] == 3
+        
+        result = reconcile_transactions(
+            self.internal_data,
+            self.provider_data,
+            settlement_lag=pd.Timedelta(days=3)
+        )
+        assert sorted(match['transaction_reference'] for match in result['matched']) == ['TXN001', 'TXN002']
+    
+    def test_window_extended_by_lag_on_provider_side(self):
+        """Test that provider rows settling after the window end can still match"""
+        result = reconcile_transactions(
+            self.internal_data,
+            self.provider_data,
+            window=('2024-01-21', '2024-01-31'),
+            settlement_lag='1D'
+        )
+        
+        assert [match['transaction_reference'] for match in result['matched']] == ['TXN001']
+        assert result['matched'][0]['transaction_date_provider'] == '2024-02-01'
+    
+    def test_provider_row_claimed_once(self):
+        """Test that two internal rows cannot both match one provider row"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN001'],
+            'amount': [100.0, 100.0],
+            'transaction_date': ['2024-01-01', '2024-01-02']
+        })
+        provider = pd.DataFrame({
+            'transaction_reference': ['TXN001'],
+            'amount': [100.0],
+            'transaction_date': ['2024-01-02']
+        })
+        
+        result = reconcile_transactions(internal, provider, settlement_lag='2D')
+        
+        assert result['summary']['matched'] == 1
+        assert result['summary']['internal_only'] == 1
+        assert result['summary']['provider_only'] == 0
+    
+    def test_repeated_references_paired_in_order(self):
+        """Test that repeated references pair up in date order within the lag"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN001'],
+            'amount': [100.0, 200.0],
+            'transaction_date': ['2024-01-01', '2024-01-02']
+        })
+        provider = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN001'],
+            'amount': [100.0, 200.0],
+            'transaction_date': ['2024-01-02', '2024-01-03']
+        })
+        
+        result = reconcile_transactions(internal, provider, settlement_lag='2D')
+        
+        assert result['summary']['matched'] == 2
+        assert result['summary']['internal_only'] == 0
+        assert result['summary']['provider_only'] == 0
+        assert [match['amount_provider'] for match in result['matched']] == [100.0, 200.0]
+    
+    def test_unpaired_repeat_falls_back_to_nearest(self):
+        """Test that a repeat outside its in-order pair still matches within the lag"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN001'],
+            'amount': [100.0, 200.0],
+            'transaction_date': ['2024-01-01', '2024-01-10']
+        })
+        provider = pd.DataFrame({
+            'transaction_reference': ['TXN001'],
+            'amount': [200.0],
+            'transaction_date': ['2024-01-11']
+        })
+        
+        result = reconcile_transactions(internal, provider, settlement_lag='2D')
+        
+        assert result['summary']['matched'] == 1
+        assert result['matched'][0]['amount_internal'] == 200.0
+        assert result['internal_only'][0]['amount'] == 100.0
+    
+    def test_missing_date_column(self):
+        """Test error handling when windowing without transaction_date"""
+        no_dates = self.internal_data.drop(columns='transaction_date')
+        
+        with pytest.raises(ValueError, match="transaction_date column not found"):
+            reconcile_transactions(no_dates, self.provider_data, window=('2024-01-01', None))
+    
+    def test_apply_column_mappings(self):
+        """Test that detected mappings rename source headers"""
+        df = pd.DataFrame(columns=['txn_ref', 'created_at', 'total'])
+        mapped = apply_column_mappings(df, map_columns(df.columns.tolist()))
+        
+        assert mapped.columns.tolist() == ['transaction_reference', 'transaction_date', 'amount']
+    
+    def test_apply_column_mappings_keeps_existing_target(self):
+        """Test that a rename onto an existing column is skipped instead of duplicating it"""
+        df = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002'],
+            'amount': [100.0, 200.0],
+            'total_amount': [110.0, 220.0]
+        })
+        mapped = apply_column_mappings(df, {'amount': 'total_amount'})
+        
+        assert mapped.columns.tolist() == ['transaction_reference', 'amount', 'total_amount']
+        assert mapped['amount'].tolist() == [100.0, 200.0]
+        
+        result = reconcile_transactions(mapped, mapped)
+        assert result['summary']['matched'] == 2
+
+class TestProgressStream:
+    """Test cases for reconciliation progress events"""
+    
+    def test_events_carry_rows_and_elapsed_time(self):
+        """Test that published events record row counts and elapsed time"""
+        job = ProgressTracker().start('job-1')
+        job.publish('rows_parsed', internal=4, provider=4)
+        job.publish('complete')
+        
+        assert [event['stage'] for event in job.events] == ['rows_parsed', 'complete']
+        assert job.events[0]['rows'] == {'internal': 4, 'provider': 4}
+        assert job.events[0]['elapsed_ms'] >= 0
+        assert job.finished
+    
+    def test_reconciliation_publishes_pipeline_stages(self):
+        """Test that reconcile_transactions reports merge and anomaly stages"""
+        internal = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN003'],
+            'amount': [100.0, 200.0, 300.0]
+        })
+        provider = pd.DataFrame({
+            'transaction_reference': ['TXN001', 'TXN002', 'TXN004'],
+            'amount': [100.0, 200.0, 400.0]
+        })
+        job = ProgressTracker().start('job-2')
+        
+        reconcile_transactions(internal, provider, progress=job)
+        
+        stages = [event['stage'] for event in job.events]
+        assert stages == ['merge_done', 'anomalies_scored']
+        assert job.events[0]['rows'] == {'matched': 2, 'internal_only': 1, 'provider_only': 1}
+    
+    def test_stream_replays_events_until_complete(self):
+        """Test that the SSE stream replays past events and stops on completion"""
+        job = progress_tracker.start('job-3')
+        job.publish('upload_received')
+        job.publish('complete')
+        
+        frames = list(stream_events('job-3'))
+        
+        assert frames[0].startswith('event: upload_received\n')
+        assert frames[-1].startswith('event: complete\n')
+        assert json.loads(frames[0].split('data: ', 1)[1])['job_id'] == 'job-3'
+    
+    def test_running_job_id_rejected(self):
+        """Test that a job id cannot be reused while its job is still running"""
+        tracker = ProgressTracker()
+        job = tracker.start('job-4')
+        
+        with pytest.raises(ValueError, match="already running"):
+            tracker.start('job-4')
+        
+        job.publish('complete')
+        assert tracker.start('job-4') is not job
+    
+    def test_job_id_read_from_query_string(self, tmp_path, monkeypatch):
+        """Test that uploads register the query-string job id and end failed streams with 'failed'"""
+        from flask import Flask
+        
+        monkeypatch.chdir(tmp_path)
+        app = Flask(__name__)
+        app.register_blueprint(reconciliation_bp, url_prefix='/api')
+        
+        response = app.test_client().post(
+            '/api/upload_and_reconcile?job_id=query-job',
+            data={'job_id': 'form-job'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 400
+        assert progress_tracker.get('form-job') is None
+        frames = list(stream_events('query-job'))
+        assert frames[-1].startswith('event: failed\n')
+    
+    def test_subscriber_wakes_when_job_starts(self):
+        """Test that waiting for a job returns as soon as it is registered"""
+        import threading
+        import time
+        
+        tracker = ProgressTracker()
+        threading.Timer(0.1, tracker.start, args=('job-5',)).start()
+        
+        started = time.monotonic()
+        job = tracker.wait_for_job('job-5', timeout=5)
+        
+        assert job is not None
+        assert time.monotonic() - started < 2
+        assert tracker.wait_for_job('unknown', timeout=0.05) is None
+
+class TestConcurrency:
+    """Test cases for concurrent request handling"""
+    
+    def test_concurrent_uploads_are_isolated(self, tmp_path, monkeypatch):
+        """Test that parallel uploads never see each other's files or results"""
+        from concurrent.futures import ThreadPoolExecutor
+        from flask import Flask
+        
+        monkeypatch.chdir(tmp_path)
+        app = Flask(__name__)
+        app.register_blueprint(reconciliation_bp, url_prefix='/api')
+        
+        def upload(client):
+            rows = 50 + client
+            internal = 'transaction_id,amount\n' + '\n'.join(f'C{client}-{i},{i}.00' for i in range(rows))
+            provider = 'ref_id,total\n' + '\n'.join(f'C{client}-{i},{i}.00' for i in range(1, rows + 1))
+            response = app.test_client().post(
+                '/api/upload_and_reconcile',
+                data={
+                    'internal_file': (io.BytesIO(internal.encode()), 'internal.csv'),
+                    'provider_file': (io.BytesIO(provider.encode()), 'provider.csv')
+                },
+                content_type='multipart/form-data'
+            )
+            return client, rows, response.status_code, response.get_json()
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(upload, range(16)))
+        
+        session_ids = set()
+        for client, rows, status, body in results:
+            assert status == 200
+            assert body['summary']['matched'] == rows - 1
+            assert all(match['transaction_reference'].startswith(f'C{client}-') for match in body['matched'])
+            session_ids.add(body['session_id'])
+        assert len(session_ids) == 16
+        # Per-request upload folders are removed once the files are read
+        assert os.listdir(tmp_path / 'uploads') == []
+    
+    def test_invalid_settlement_lag_rejected(self, tmp_path, monkeypatch):
+        """Test that negative, non-finite or oversized lags are a client error"""
+        from flask import Flask
+        
+        monkeypatch.chdir(tmp_path)
+        app = Flask(__name__)
+        app.register_blueprint(reconciliation_bp, url_prefix='/api')
+        
+        for lag in ['-1', 'inf', 'nan', 'soon', '1e300']:
+            response = app.test_client().post(
+                '/api/upload_and_reconcile',
+                data={
+                    'internal_file': (io.BytesIO(b'transaction_id,amount,date\nT1,1.00,2024-01-01'), 'internal.csv'),
+                    'provider_file': (io.BytesIO(b'ref_id,total,date\nT1,1.00,2024-01-02'), 'provider.csv'),
+                    'settlement_lag_days': lag
+                },
+                content_type='multipart/form-data'
+            )
+            assert response.status_code == 400, lag
+    
+    def test_result_cache_evicts_least_recently_used(self):
+        """Test that the result cache stays bounded"""
+        cache = ResultCache(max_entries=2)
+        cache.put('a', {'matched': []})
+        cache.put('b', {'matched': []})
+        cache.get('a')
+        cache.put('c', {'matched': []})
+        
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert len(cache) == 2
+
 class TestIntegration:
     """Integration tests for the complete reconciliation workflow"""
     
@@ -298,8 +831,8 @@ TXN004,400.00,Pending"""
         internal_mappings = map_columns(internal_df.columns.tolist())
         provider_mappings = map_columns(provider_df.columns.tolist())
         
-        internal_df = internal_df.rename(columns=internal_mappings)
-        provider_df = provider_df.rename(columns=provider_mappings)
+        internal_df = apply_column_mappings(internal_df, internal_mappings)
+        provider_df = apply_column_mappings(provider_df, provider_mappings)
         
         # Perform reconciliation
         result = reconcile_transactions(internal_df, provider_df)